@@ -1,11 +1,57 @@
 import boto3
+import functools
 import json
 import logging
+import os
 import re  # <--- CRITICAL IMPORT
-from typing import Dict, Any
-from prompts import MASTER_PROMPT_TEMPLATE
+from botocore.config import Config
+from typing import Dict, Any, Optional
+from prompts import MASTER_PROMPT_TEMPLATE, EVAL_PROMPT_TEMPLATE
 import logic
 
+# orjson is much faster for the Bedrock request/response bodies; fall back to
+# the stdlib if it isn't packaged with the function.
+try:
+    import orjson
+    _json_dumps = orjson.dumps  # returns bytes, which invoke_model accepts
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+# One Bedrock client per container. Building it per call re-parses the service model
+# and reloads credentials on every warm invocation.
+_BEDROCK_REGION = os.environ.get('BEDROCK_REGION', 'us-east-2')
+_BEDROCK_HAIKU_ID = "us.anthropic.claude-3-haiku-20240307-v1:0"
+_BEDROCK = boto3.client(
+    'bedrock-runtime',
+    region_name=_BEDROCK_REGION,
+    config=Config(connect_timeout=2, read_timeout=30, retries={'max_attempts': 2}, tcp_keepalive=True)
+)
+
+# Precompiled patterns (module level so we don't pay the re cache lookup every turn)
+_PRICE_RE = re.compile(r'\$\s*([0-9][0-9,]*(?:\.\d+)?)')
+_OPEN_PRICE_RE = re.compile(r'Opening Price: \$([0-9.]+)')
+_JSON_FENCE_RE = re.compile(r'```json\s*|\s*```')
+_AGREE_RE = re.compile(r'\b(?:deal|agree[ds]?|accept(?:s|ed)?|done|sounds good|okay)\b', re.IGNORECASE)
+_PREFIX_RE = re.compile(r'^(?:(?:negotiating|response:|alex:|state:)[ :]*)+', re.IGNORECASE)
+# All three terms in one pass; dispatch on m.lastgroup
+_TERMS_RE = re.compile(
+    r'\$\s*(?P<price>[0-9][0-9,]*(?:\.\d+)?)'
+    r'|(?P<days>\d+)\s*days?'
+    r'|(?P<kvol>\d+(?:\.\d+)?)\s*k\b'
+    r'|(?P<uvol>\d+(?:,\d{3})*)\s*(?:units|pcs|chips)',
+    re.IGNORECASE
+)
+# Anything that reads as a negation or rejection ("I do not accept $50", "$50 is too high",
+# "$50? No.") means a price may be refused rather than offered, which is Haiku's job
+_REJECT_CUE_RE = re.compile(
+    rf"{logic.NEGATION_PATTERN}|\b(?:no|refuse[ds]?|reject(?:s|ed)?|decline[ds]?|too (?:high|much|expensive))\b"
+)
+# A cue followed (in the same clause) by the price it rejects, and an explicit counteroffer
+_REJECTION_PRICE_RE = re.compile(rf"(?:{_REJECT_CUE_RE.pattern})[^.?!$]*\$\s*([0-9][0-9,]*(?:\.\d+)?)")
+_COUNTEROFFER_RE = re.compile(r'(?:how about|counter(?:offer)?|instead|what if|propose|offer)\s*(?:you\s+)?\$\s*([0-9][0-9,]*(?:\.\d+)?)')
+
 # In ai_service.py
 
 # 1. ADD this new constant at the top with your other imports/constants
@@ -34,10 +80,26 @@ JSON FORMAT:
 def extract_negotiation_terms(user_input: str) -> dict:
     """
     Uses Claude 3 Haiku to intelligently extract terms, fixing the 'Regex Trap'.
+    Unambiguous messages are handled locally first so most turns skip the round-trip.
     """
+    local = extract_terms_locally(user_input)
+    if local is not None:
+        return local
+    return extract_terms_with_haiku(user_input)
+
+def extract_terms_locally(user_input: str) -> Optional[dict]:
+    """Cheap, in-process extraction. Returns None when the message needs Haiku."""
+    # "ok", "deal", "sounds good"... nothing to extract without a number
+    u = (user_input or '').strip()
+    if '$' not in u and not any(c.isdigit() for c in u):
+        return {"price": None, "delivery": None, "volume": None}
+    terms = _local_extract_cached(u)
+    # Copy so callers can't mutate the cached entry
+    return None if terms is None else dict(terms)
+
+def extract_terms_with_haiku(user_input: str) -> dict:
+    """The Bedrock round-trip behind extract_negotiation_terms."""
     try:
-        bedrock = boto3.client('bedrock-runtime', region_name="us-east-2")
-        
         # Combine instructions with the specific input
         messages = [
             {"role": "user", "content": f"{EXTRACTION_SYS_PROMPT}\n\nUser Message: \"{user_input}\""}
@@ -50,19 +112,19 @@ def extract_negotiation_terms(user_input: str) -> dict:
             "messages": messages
         }
 
-        response = bedrock.invoke_model(
-            modelId="us.anthropic.claude-3-haiku-20240307-v1:0",
-            body=json.dumps(body),
+        response = _BEDROCK.invoke_model(
+            modelId=_BEDROCK_HAIKU_ID,
+            body=_json_dumps(body),
             contentType='application/json'
         )
 
-        result = json.loads(response['body'].read())
+        result = _json_loads(response['body'].read())
         response_text = result['content'][0]['text'].strip()
         
         # Parse the JSON response
         # Sometimes models add ```json ... ``` wrappers, so we clean them
-        clean_json = re.sub(r'```json\s*|\s*```', '', response_text)
-        data = json.loads(clean_json)
+        clean_json = _JSON_FENCE_RE.sub('', response_text)
+        data = _json_loads(clean_json)
         
         return data
 
@@ -76,55 +138,120 @@ logger = logging.getLogger(__name__)
 # --- HELPERS ---
 
 def extract_price(text):
-    if not text: return None
-    # Find all prices, take the LAST one mentioned
-    matches = re.findall(r'\$\s*([0-9][0-9,]*(?:\.\d+)?)', text)
-    if matches:
-        try: return float(matches[-1].replace(',', ''))
-        except: return None
-    return None
-
-def extract_delivery(text):
-    if not text: return None
-    matches = re.findall(r'(\d+)\s*days?', text.lower())
-    if matches: return int(matches[-1])
+    if not text or '$' not in text: return None
+    # Take the LAST price mentioned: walk back from the final '$' instead of
+    # collecting every match in the text
+    i = text.rfind('$')
+    while i >= 0:
+        m = _PRICE_RE.match(text, i)
+        if m:
+            try: return float(m.group(1).replace(',', ''))
+            except: return None
+        i = text.rfind('$', 0, i)
     return None
 
-def extract_volume(text):
-    if not text: return None
-    txt = text.lower()
-    m_k = re.search(r'(\d+(?:\.\d+)?)\s*k\b', txt)
-    if m_k: return int(float(m_k.group(1)) * 1000)
-    m_u = re.search(r'(\d+(?:,\d{3})*)\s*(?:units|pcs|chips)', txt)
-    if m_u: return int(m_u.group(1).replace(',', ''))
-    return None
+def scan_terms(text):
+    """Single-pass price/delivery/volume scan. Keeps the LAST mention of each term."""
+    terms = {"price": None, "delivery": None, "volume": None}
+    if not text: return terms
+    for m in _TERMS_RE.finditer(text):
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == 'price':
+            terms['price'] = float(value.replace(',', ''))
+        elif kind == 'days':
+            terms['delivery'] = int(value)
+        elif kind == 'kvol':
+            terms['volume'] = int(float(value) * 1000)
+        else:
+            terms['volume'] = int(value.replace(',', ''))
+    return terms
+
+@functools.lru_cache(maxsize=256)
+def _local_extract_cached(user_input):
+    # Mobile keyboards send "can’t"; fold it so the cue patterns see "can't"
+    txt = user_input.lower().replace('\u2019', "'")
+    # Ranges ("$40-$45", "between") are what Haiku is for
+    if '-' in txt or 'between' in txt: return None
+
+    # Rejected prices must not come back as offers. Every rejection cue has to be
+    # "cue ... $price" in one clause so the price can be dropped; anything else
+    # ("$50 is too high", "$50? No.") goes to Haiku.
+    rejections = sum(1 for _ in _REJECT_CUE_RE.finditer(txt))
+    if rejections:
+        txt, dropped = _REJECTION_PRICE_RE.subn(' ', txt)
+        if dropped < rejections: return None
+
+    # Numbers the scanner can't place ("I offer 400", "45 dollars") go to Haiku
+    if any(c.isdigit() for c in _TERMS_RE.sub(' ', txt)): return None
+
+    counter = _COUNTEROFFER_RE.findall(txt)
+    # With a rejection, only an explicit counter phrase makes the offer unambiguous:
+    # "I can't do $50. $45 works?" and "I won't pay more than $40" both go to Haiku
+    if rejections and not counter: return None
+
+    terms = scan_terms(txt)
+    if counter:
+        terms['price'] = float(counter[-1].replace(',', ''))
+    return terms
+
+def _strip_thinking(text):
+    """Removes <thinking>...</thinking> blocks with a linear find() scan (no regex backtracking)."""
+    if '<thinking>' not in text: return text
+    out = []
+    i = 0
+    while True:
+        a = text.find('<thinking>', i)
+        if a < 0:
+            out.append(text[i:])
+            break
+        b = text.find('</thinking>', a)
+        if b < 0:
+            # Unclosed tag: leave the rest as-is
+            out.append(text[i:])
+            break
+        out.append(text[i:a])
+        i = b + len('</thinking>')
+    return ''.join(out)
 
 def clean_ai_response(text):
     if not isinstance(text, str): return text
-    text = re.sub(r'<thinking>.*?</thinking>', '', text, flags=re.DOTALL).strip()
-    prefixes = ["NEGOTIATING", "Negotiating", "negotiating", "Response:", "Alex:", "State:"]
-    for prefix in prefixes:
-        if text.lower().startswith(prefix.lower()):
-            text = text[len(prefix):].lstrip(" :")
+    text = _strip_thinking(text).strip()
+    # Strip leaked labels like "NEGOTIATING:" / "Alex:" in one anchored match
+    text = _PREFIX_RE.sub('', text, count=1)
+    # Collapse responses the model repeated twice (A B A B -> A B)
+    if '\n\n' not in text: return text.strip()
     paragraphs = text.split('\n\n')
-    if len(paragraphs) > 1 and len(paragraphs) % 2 == 0:
-        mid = len(paragraphs) // 2
-        if paragraphs[:mid] == paragraphs[mid:]:
-            return '\n\n'.join(paragraphs[:mid])
+    if len(paragraphs) & 1: return text.strip()
+    mid = len(paragraphs) // 2
+    if paragraphs[0] == paragraphs[mid] and paragraphs[:mid] == paragraphs[mid:]:
+        return '\n\n'.join(paragraphs[:mid])
     return text.strip()
 
 # --- THE PUPPETEER LOGIC ---
 
-def generate_turn_guidance(user_input, history, deal_params_str):
+@functools.lru_cache(maxsize=1024)
+def _next_price(last_ai_price, user_price):
+    """Rule E concession kernel: returns (tag, next_price) from the gap to the user's offer."""
+    gap_percent = (last_ai_price - user_price) / last_ai_price
+    if gap_percent > 0.20:
+        return 'lowball', round(last_ai_price * 0.995, 2)
+    if gap_percent < 0.10:
+        return 'close', round(last_ai_price * 0.975, 2)
+    return 'standard', round(last_ai_price * 0.985, 2)
+
+def generate_turn_guidance(user_input, history, deal_params_str, extracted=None):
     """
     Calculates the EXACT move using Neuro-Symbolic extraction.
+    Pass `extracted` if the caller already ran extract_negotiation_terms (e.g. in parallel).
     """
     # --- 1. NEW: Intelligent Extraction ---
     # We call Haiku ONCE to get all terms accurately
-    extracted = extract_negotiation_terms(user_input)
+    if extracted is None:
+        extracted = extract_negotiation_terms(user_input)
     
     # We use these extracted values throughout the function.
-    # DO NOT call extract_price() or extract_delivery() again later.
+    # DO NOT re-scan the user's message for terms later.
     user_price = extracted.get('price')
     user_delivery = extracted.get('delivery')
     user_volume = extracted.get('volume')
@@ -155,6 +282,7 @@ def generate_turn_guidance(user_input, history, deal_params_str):
     for msg in reversed(history):
         if msg.get('role') == 'assistant':
             content = msg.get('content', '')
+            if '$' not in content: continue
             # It is okay to use regex on AI text because AI text is predictable
             p = extract_price(content) 
             if p: 
@@ -164,7 +292,7 @@ def generate_turn_guidance(user_input, history, deal_params_str):
     # Fallback for AI Price
     if not last_ai_price:
         if deal_params_str:
-            match = re.search(r'Opening Price: \$([0-9.]+)', deal_params_str)
+            match = _OPEN_PRICE_RE.search(deal_params_str)
             if match: last_ai_price = float(match.group(1))
             else: last_ai_price = 400.0
         else:
@@ -172,8 +300,10 @@ def generate_turn_guidance(user_input, history, deal_params_str):
 
     # --- RULE A: AGREEMENT CHECK (Revised) ---
     # If we are here, is_deal was False. So if the user said "agree", something is missing.
-    agreement_words = ["deal", "agree", "accept", "done", "sounds good", "okay"]
-    is_agreement = any(w in user_input.lower() for w in agreement_words)
+    # Long messages are negotiation, not a bare "ok"; skip the scan for them.
+    user_input_lower = user_input.lower()
+    # Word-boundary match so "ok" doesn't fire inside "stockpile"
+    is_agreement = len(user_input) < 200 and bool(_AGREE_RE.search(user_input))
     
     if is_agreement:
         # We rely on the Haiku extraction we did at the top
@@ -200,33 +330,30 @@ def generate_turn_guidance(user_input, history, deal_params_str):
     # --- RULE D: STALEMATE ---
     if len(history) >= 2 and history[-2].get('role') == 'user':
         last_user_input = history[-2].get('content', '')
-        if user_input.strip().lower() == last_user_input.strip().lower():
+        if user_input_lower.strip() == last_user_input.strip().lower():
              return f"User repeated their offer. You MUST hold firm at exactly ${last_ai_price}. Say: 'As I stated, I cannot accept that.'"
 
     # --- RULE E: CALCULATION LOGIC ---
     if user_price:
-        gap_percent = (last_ai_price - user_price) / last_ai_price
+        tag, next_price = _next_price(last_ai_price, user_price)
         
-        if gap_percent > 0.20:
-            next_price = round(last_ai_price * 0.995, 2)
+        if tag == 'lowball':
             return f"User is lowballing (${user_price}). You MUST offer exactly ${next_price}. Say: 'That is far too low.'"
             
-        elif gap_percent < 0.10: 
-             next_price = round(last_ai_price * 0.975, 2) 
+        elif tag == 'close': 
              return f"We are getting close. Offer exactly ${next_price}. Say: 'I can make a significant move.'"
              
         else: 
-             next_price = round(last_ai_price * 0.985, 2)
              return f"Standard negotiation. Offer exactly ${next_price}."
             
     return f"Hold at ${last_ai_price}. Discuss delivery time."
 
 # --- CORE FUNCTIONS ---
 
-def get_bedrock_response(prompt: str, region: str = "us-east-2") -> str:
+def get_bedrock_response(prompt: str, region: str = _BEDROCK_REGION) -> str:
     """Get response from Amazon Bedrock"""
     try:
-        bedrock = boto3.client('bedrock-runtime', region_name=region)
+        bedrock = _BEDROCK if region == _BEDROCK_REGION else boto3.client('bedrock-runtime', region_name=region)
         body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 500,
@@ -234,21 +361,22 @@ def get_bedrock_response(prompt: str, region: str = "us-east-2") -> str:
             "messages": [{"role": "user", "content": prompt}]
         }
         response = bedrock.invoke_model(
-            modelId="us.anthropic.claude-3-haiku-20240307-v1:0",
-            body=json.dumps(body),
+            modelId=_BEDROCK_HAIKU_ID,
+            body=_json_dumps(body),
             contentType='application/json'
         )
-        result = json.loads(response['body'].read())
+        result = _json_loads(response['body'].read())
         return clean_ai_response(result['content'][0]['text'].strip())
     except Exception as e:
         logger.error(f"Bedrock error: {e}")
         return f"Error: {str(e)[:50]}"
 
-def create_negotiation_prompt(user_input: str, deal_params_str: str, history: list) -> str:
+def create_negotiation_prompt(user_input: str, deal_params_str: str, history: list,
+                              extracted: Optional[dict] = None) -> str:
     """Create the prompt with injected Python logic"""
     # Run logic safely
     try:
-        guidance = generate_turn_guidance(user_input, history, deal_params_str)
+        guidance = generate_turn_guidance(user_input, history, deal_params_str, extracted=extracted)
     except Exception as e:
         logger.error(f"Guidance Error: {e}")
         guidance = "Negotiate professionally."
@@ -267,8 +395,8 @@ def create_negotiation_prompt(user_input: str, deal_params_str: str, history: li
     )
     return prompt
 
-def get_evaluation(history: list, deal_params: Dict, final_terms: Dict) -> str:
-    """Generates the final grading report"""
+def _build_evaluation_body(history: list, deal_params: Dict, final_terms: Dict) -> dict:
+    """Bedrock request body for the grading report (shared by get_evaluation and stream_evaluation)"""
     # Safe getters
     final_price = final_terms.get('price', 'N/A')
     final_delivery = final_terms.get('delivery', 'N/A')
@@ -279,105 +407,65 @@ def get_evaluation(history: list, deal_params: Dict, final_terms: Dict) -> str:
         conversation_log = "\n".join([f"{m.get('role','').upper()}: {m.get('content','')}" for m in history])
   
     # 2. The FULL Original Rubric Prompt
-    eval_prompt = f"""
-You are an expert negotiation coach and evaluator. Analyze the following B2B negotiation and provide a comprehensive evaluation.
-
---- SELLER'S (AI's) SECRET PARAMETERS ---
-(The AI uses 0-5% reductions between price/delivery levels to enable dynamic negotiation with meaningful concessions)
-Price Opening: ${deal_params['price']['opening']}
-Price Target (AI's Ideal): ${deal_params['price']['target']}
-Price Reservation (AI's Walk-away): ${deal_params['price']['reservation']}
-
-Delivery Opening: {deal_params['delivery']['opening']} days
-Delivery Target (AI's Ideal): {deal_params['delivery']['target']} days
-Delivery Reservation (AI's Fastest): {deal_params['delivery']['reservation']} days
-
---- NEGOTIATION CONVERSATION ---
-{conversation_log}
-
---- ACADEMIC EVALUATION RUBRIC (Evaluate the USER) ---
-Please evaluate the USER'S performance on the following criteria. Note that the AI was instructed to use strict 0-5% reductions.
-
-1. Deal Quality & Outcome (Weight: 33%)
-Excellent (A: 90-100): Achieved a deal at or very close to the AI's reservation points for both price and delivery.
-Proficient (B: 80-89): Achieved a strong deal, significantly better than the AI's opening offers but not quite at reservation limits.
-Developing (C: 70-79): Reached an agreement, but the deal is only slightly better than the AI's opening offers.
-Needs Improvement (D/F: 0-69): Failed to reach an agreement, or accepted a deal at or worse than the AI's opening offers.
-
-2. Trade-off Strategy & Analytical Reasoning (Weight: 28%)
-Excellent (A: 90-100): User demonstrates strong analytical reasoning and actively proposes logical, win-win trade-offs.
-Proficient (B: 80-89): User identifies at least one meaningful trade-off with sound reasoning.
-Developing (C: 70-79): User shows limited recognition of trade-offs; tends to focus on single variables.
-Needs Improvement (D/F: 0-69): User made no attempt to use trade-offs; offers were inconsistent or illogical.
-
-3. Professionalism & Communication (Weight: 17%)
-Excellent (A: 90-100): User maintains professional tone, justifies positions with business logic, shows strong persuasion skills.
-Proficient (B: 80-89): User is mostly professional and clear with minor lapses.
-Developing (C: 70-79): User has some professional tone but lacks clarity in justifications.
-Needs Improvement (D/F: 0-69): User used unprofessional, argumentative, or overly casual tone.
-
-4. Negotiation Process Management (Weight: 11%)
-Excellent (A: 90-100): User efficiently manages negotiation flow, summarizes progress, confirms offers clearly.
-Proficient (B: 80-89): User is mostly structured with minor flow issues.
-Developing (C: 70-79): User's conversation flow is disorganized or purely reactive.
-Needs Improvement (D/F: 0-69): User's process is chaotic or incomplete.
-
-5. Creativity & Adaptability (Weight: 11%)
-Excellent (A: 90-100): User employs innovative solutions and adapts effectively to counteroffers.
-Proficient (B: 80-89): User shows some creativity or adaptation.
-Developing (C: 70-79): User shows limited adaptation, mostly repeats offers.
-Needs Improvement (D/F: 0-69): User made no attempt to adjust strategy or be creative.
-
---- OUTPUT FORMAT ---
-FINAL EVALUATION REPORT
-
-Final Deal Achieved:
-Price: ${final_price}
-Delivery: {final_delivery} days
-Volume: {final_volume} units
-
-Metrics Scores:
-Deal Quality: [score]/100 (Weight: 33%)
-Trade-off Strategy: [score]/100 (Weight: 28%)
-Professionalism: [score]/100 (Weight: 17%)
-Process Management: [score]/100 (Weight: 11%)
-Creativity & Adaptability: [score]/100 (Weight: 11%)
-
-Overall Weighted Score: [calculated_score]/100
-
-Key Strengths:
-[Specific strength based on high-scoring categories]
-[Additional strength]
-
-Areas for Improvement:
-[Specific area based on low-scoring categories]
-[Additional area]
-
-Feedback & Recommendations:
-[2-3 paragraphs of constructive, specific feedback about how the user engaged with the AI's dynamic concession patterns and negotiation flexibility.]
-"""
+    p = deal_params['price']
+    d = deal_params['delivery']
+    eval_prompt = EVAL_PROMPT_TEMPLATE.format_map({
+        'price_opening': p['opening'],
+        'price_target': p['target'],
+        'price_reservation': p['reservation'],
+        'delivery_opening': d['opening'],
+        'delivery_target': d['target'],
+        'delivery_reservation': d['reservation'],
+        'conversation_log': conversation_log,
+        'final_price': final_price,
+        'final_delivery': final_delivery,
+        'final_volume': final_volume,
+    })
     
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 1500,
+        "temperature": 0.5,
+        "messages": [{"role": "user", "content": eval_prompt}]
+    }
+
+def get_evaluation(history: list, deal_params: Dict, final_terms: Dict) -> str:
+    """Generates the final grading report"""
     # 3. Call Bedrock
     try:
-        bedrock = boto3.client('bedrock-runtime', region_name="us-east-2")
+        body = _build_evaluation_body(history, deal_params, final_terms)
         
-        body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1500,
-            "temperature": 0.5,
-            "messages": [{"role": "user", "content": eval_prompt}]
-        }
-        
-        response = bedrock.invoke_model(
-            modelId="us.anthropic.claude-3-haiku-20240307-v1:0",
-            body=json.dumps(body),
+        response = _BEDROCK.invoke_model(
+            modelId=_BEDROCK_HAIKU_ID,
+            body=_json_dumps(body),
             contentType='application/json'
         )
         
-        result = json.loads(response['body'].read())
+        result = _json_loads(response['body'].read())
         raw_text = result['content'][0]['text'].strip()
         return raw_text
         
     except Exception as e:
         logger.error(f"Bedrock evaluation error: {e}")
         return f"Error generating evaluation: {str(e)}"
+
+def stream_evaluation(history: list, deal_params: Dict, final_terms: Dict):
+    """Same report as get_evaluation, yielded as text chunks while Bedrock generates it"""
+    try:
+        body = _build_evaluation_body(history, deal_params, final_terms)
+        response = _BEDROCK.invoke_model_with_response_stream(
+            modelId=_BEDROCK_HAIKU_ID,
+            body=_json_dumps(body),
+            contentType='application/json'
+        )
+        for event in response['body']:
+            chunk = event.get('chunk')
+            if not chunk: continue
+            data = _json_loads(chunk['bytes'])
+            if data.get('type') == 'content_block_delta':
+                text = data.get('delta', {}).get('text')
+                if text: yield text
+
+    except Exception as e:
+        logger.error(f"Bedrock evaluation stream error: {e}")
+        yield f"Error generating evaluation: {str(e)}"
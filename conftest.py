@@ -0,0 +1,49 @@
+import copy
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+# main.py builds its DynamoDB resource at import time
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-2')
+
+import main
+
+class FakeTable:
+    """In-memory stand-in for the NegotiationSessions table (get/put/conditional list_append)."""
+    def __init__(self):
+        self.items = {}
+        # Turns "another container" appends just before each of our next update_item calls
+        self.interlopers = []
+
+    def get_item(self, Key):
+        item = self.items.get(Key['session_id'])
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item):
+        self.items[Item['session_id']] = copy.deepcopy(Item)
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression, ExpressionAttributeValues):
+        conversation = self.items[Key['session_id']]['conversation']
+        if self.interlopers:
+            conversation.extend(self.interlopers.pop(0))
+        if len(conversation) != ExpressionAttributeValues[':n']:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+        conversation.extend(copy.deepcopy(ExpressionAttributeValues[':m']))
+
+@pytest.fixture
+def table(monkeypatch):
+    fake = FakeTable()
+    monkeypatch.setattr(main, 'table', fake)
+    monkeypatch.setattr(main, 'session_cache', type(main.session_cache)())
+    return fake
+
+@pytest.fixture
+def bedrock(monkeypatch):
+    """Replaces the negotiation call; records every prompt and answers 'AI turn N'."""
+    prompts = []
+    def respond(prompt):
+        prompts.append(prompt)
+        return f"AI turn {len(prompts)}"
+    monkeypatch.setattr(main, 'get_bedrock_response', respond)
+    return prompts
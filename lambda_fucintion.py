@@ -1,38 +1,111 @@
+import base64
 import json
+import logging
+import os
+from fastapi import HTTPException
 from mangum import Mangum
-from main import app
+from pydantic import ValidationError
+from main import app, chat, ChatRequest, decimal_default
+
+# Set DEBUG=1 on the function to log full events/responses
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG if os.environ.get('DEBUG') == '1' else logging.INFO)
 
 # Create handler
 handler = Mangum(app, lifespan="off")
 
+# Filled into requestContext.http when API Gateway leaves them out
+DEFAULT_HTTP = {'sourceIp': '127.0.0.1', 'userAgent': 'api-gateway'}
+
+# Hot JSON endpoints served without the ASGI round-trip through Mangum.
+# Everything else (preflight, docs, other routes) still goes through FastAPI.
+FAST_ROUTES = {('POST', '/api/chat'): (chat, ChatRequest)}
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+def _json_response(status, payload, origin=None):
+    headers = dict(JSON_HEADERS)
+    # Mirror what CORSMiddleware (allow_origins=["*"], allow_credentials=True) would add
+    if origin:
+        headers.update({
+            'Access-Control-Allow-Origin': origin,
+            'Access-Control-Allow-Credentials': 'true',
+            'Vary': 'Origin'
+        })
+    return {'statusCode': status, 'headers': headers, 'body': json.dumps(payload, default=decimal_default)}
+
+# 422 bodies mirror FastAPI's RequestValidationError: a list of errors located under "body"
+def _prefix_body(errors):
+    for err in errors:
+        err['loc'] = ['body', *err.get('loc', ())]
+    return errors
+
+def _parse_body(body):
+    """Returns (data, errors); errors for a missing or unparseable body are shaped like FastAPI's."""
+    if not body:
+        return None, [{'type': 'missing', 'loc': ['body'], 'msg': 'Field required', 'input': None}]
+    try:
+        return json.loads(body), None
+    except json.JSONDecodeError as e:
+        return None, [{'type': 'json_invalid', 'loc': ['body', e.pos], 'msg': 'JSON decode error',
+                       'input': {}, 'ctx': {'error': e.msg}}]
+    except ValueError as e:  # not valid UTF-8
+        return None, [{'type': 'json_invalid', 'loc': ['body', 0], 'msg': 'JSON decode error',
+                       'input': {}, 'ctx': {'error': str(e)}}]
+
+def _fast_route(event):
+    """Calls the endpoint directly for FAST_ROUTES; returns None to fall back to Mangum."""
+    http = (event.get('requestContext') or {}).get('http') or {}
+    method = http.get('method') or event.get('httpMethod')
+    path = event.get('rawPath') or event.get('path')
+    route = FAST_ROUTES.get((method, path))
+    if route is None:
+        return None
+
+    endpoint, model = route
+    origin = {k.lower(): v for k, v in (event.get('headers') or {}).items()}.get('origin')
+    body = event.get('body')
+    if body and event.get('isBase64Encoded'):
+        body = base64.b64decode(body)
+
+    data, errors = _parse_body(body)
+    if errors is None:
+        # Validated the way FastAPI does it, so a JSON list or string fails as
+        # model_attributes_type instead of a TypeError from model(**data)
+        try:
+            request = model.model_validate(data, from_attributes=True)
+        except ValidationError as e:
+            errors = _prefix_body(json.loads(e.json(include_url=False)))
+    if errors is not None:
+        return _json_response(422, {'detail': errors}, origin)
+
+    try:
+        return _json_response(200, endpoint(request), origin)
+    except HTTPException as e:
+        return _json_response(e.status_code, {'detail': e.detail}, origin)
+
 def lambda_handler(event, context):
     """AWS Lambda entry point with robust event handling"""
     try:
-        # Print the event for debugging
-        print(f"Received event: {json.dumps(event, default=str)}")
+        # Log the event for debugging (only serialized when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received event: %s", json.dumps(event, default=str))
         
-        # Ensure required fields exist for Mangum
-        if 'requestContext' not in event: 
+        # Ensure required fields exist for Mangum (API Gateway may send them as null)
+        if not event.get('requestContext'):
             event['requestContext'] = {}
-        
-        if 'http' not in event. get('requestContext', {}):
+        if not event['requestContext'].get('http'):
             event['requestContext']['http'] = {}
-        
-        # Add missing sourceIp if not present
-        if 'sourceIp' not in event['requestContext']['http']:
-            event['requestContext']['http']['sourceIp'] = '127.0.0.1'
-        
-        # Add missing userAgent if not present
-        if 'userAgent' not in event['requestContext']['http']:
-            event['requestContext']['http']['userAgent'] = 'api-gateway'
-        
-        # Ensure headers exist
-        if 'headers' not in event:
+        http = event['requestContext']['http']
+        for key, value in DEFAULT_HTTP.items():
+            http.setdefault(key, value)
+        if not event.get('headers'):
             event['headers'] = {}
         
-        # Call Mangum handler
-        response = handler(event, context)
-        print(f"Success response: {response}")
+        # Hot path first, then Mangum for everything else
+        response = _fast_route(event)
+        if response is None:
+            response = handler(event, context)
+        logger.debug("Success response: %s", response)
         return response
         
     except Exception as e:
@@ -1,24 +1,29 @@
 import random
 import re
+import zlib
+
+# Precompiled fallback pattern for AI text: price and delivery in one scan
+_TERMS_RE = re.compile(r'\$\s*(?P<price>[0-9][0-9,]*(?:\.\d+)?)|(?P<delivery>\d+)\s*days?', re.IGNORECASE)
 
 # --- 1. DEAL GENERATION ---
 def generate_deal_parameters(seed=None):
     """Generates the hidden math numbers."""
-    if seed is not None:
-        try:
-            if isinstance(seed, str): seed = hash(seed) % (2**32)
-            random.seed(seed)
-        except: pass
+    # Local generator: no reseeding of the shared global one on every session.
+    # crc32, not hash(): str hashes are randomized per process, so the same student
+    # would get a different deal in every Lambda container.
+    if isinstance(seed, str): seed = zlib.crc32(seed.encode('utf-8'))
+    try: rng = random.Random(seed)
+    except TypeError: rng = random.Random()
     
     # Price
-    opening_price = round(random.uniform(30, 50) * 10, 2)
-    target_percent = random.uniform(0.05, 0.08) 
+    opening_price = round(rng.uniform(30, 50) * 10, 2)
+    target_percent = rng.uniform(0.05, 0.08) 
     target_price = round(opening_price * (1 - target_percent), 2)
-    reservation_percent = random.uniform(0.12, 0.15)
+    reservation_percent = rng.uniform(0.12, 0.15)
     reservation_price = round(opening_price * (1 - reservation_percent), 2)
 
     # Delivery
-    opening_delivery = int(random.randint(25, 45))
+    opening_delivery = int(rng.randint(25, 45))
     target_delivery = int(opening_delivery * 0.85) 
     reservation_delivery = int(opening_delivery * 0.70)
 
@@ -32,18 +37,60 @@ def generate_deal_parameters(seed=None):
     }
 
 # --- 2. FORMATTING ---
+_DEAL_TMPL = """
+--- NEGOTIATION DATA ---
+1. Opening Price: ${price_opening}
+2. Target Price: ${price_target}
+3. Walk-away Price: ${price_reservation}
+4. Standard Volume: {volume_standard} units
+5. Opening Delivery: {delivery_opening} days
+""".format_map
+
+_GREETING_TMPL = (
+    "Hello! I'm Alex from ChipSource Inc. We are looking to sell our CS-1000 chips. "
+    "Our standard opening is ${price_opening} per unit "
+    "with {delivery_opening}-day delivery. What works for you?"
+).format_map
+
+def _deal_fields(params):
+    p = params['price']
+    d = params['delivery']
+    v = params['volume']
+    return {
+        'price_opening': p['opening'],
+        'price_target': p['target'],
+        'price_reservation': p['reservation'],
+        'volume_standard': v['standard'],
+        'delivery_opening': d['opening'],
+    }
+
 def format_deal_parameters(params):
     """Returns PURE DATA."""
-    return f"""
---- NEGOTIATION DATA ---
-1. Opening Price: ${params['price']['opening']}
-2. Target Price: ${params['price']['target']}
-3. Walk-away Price: ${params['price']['reservation']}
-4. Standard Volume: {params['volume']['standard']} units
-5. Opening Delivery: {params['delivery']['opening']} days
-"""
+    return _DEAL_TMPL(_deal_fields(params))
+
+def format_session_texts(params):
+    """Returns (deal_params_str, greeting) from a single read of the params."""
+    fields = _deal_fields(params)
+    return _DEAL_TMPL(fields), _GREETING_TMPL(fields)
 
 # --- 3. STRICT DEAL DETECTION (Updated) ---
+STRONG_SIGNALS = (
+    "i accept", "we accept", "accepted", "i agree", "we agree", "agreed",
+    "deal confirmed", "confirm deal", "confirm the deal",
+    "sounds good", "works for me", "perfect", "it's a deal", "its a deal", 
+    "let's do it", "lets do it", "i can do that", "that works",
+    "done", "fine", "ok deal", "okay deal", "deal"
+)
+# Single-word signals: a bare "deal" / "agreed" is caught with a set lookup per token
+_SIGNAL_WORDS = frozenset(p for p in STRONG_SIGNALS if ' ' not in p)
+_SIGNAL_RE = re.compile('|'.join(re.escape(p) for p in STRONG_SIGNALS))
+# Shared with ai_service, which widens it into its rejection cues
+NEGATION_PATTERN = r"\b(?:don'?t|can(?:'?t|not)|won'?t|not|unable)\b"
+_NEG_RE = re.compile(NEGATION_PATTERN)
+
+# The offer on the table lives in the last couple of AI messages; never scan further back
+BACKFILL_LOOKBACK = 6
+
 def detect_deal_readiness(history, current_extracted_terms=None):
     """
     Checks if the deal is ACTUALLY done using terms extracted by the AI.
@@ -59,27 +106,20 @@ def detect_deal_readiness(history, current_extracted_terms=None):
     last_msg = history[-1]
     content = last_msg['content'].lower()
     
-    # 1. Check for Agreement Signal
-    strong_signals = [
-        "i accept", "we accept", "accepted", "i agree", "we agree", "agreed",
-        "deal confirmed", "confirm deal", "confirm the deal",
-        "sounds good", "works for me", "perfect", "it's a deal", "its a deal", 
-        "let's do it", "lets do it", "i can do that", "that works",
-        "done", "fine", "ok deal", "okay deal", "deal"
-    ]
-    
-    has_signal = any(phrase in content for phrase in strong_signals)
+    # 1. Check for Agreement Signal (one scan over all phrases)
+    has_signal = not _SIGNAL_WORDS.isdisjoint(content.split()) or bool(_SIGNAL_RE.search(content))
     
     # Negation Check (e.g. "I do NOT accept")
-    negations = ["don't", "dont", "cannot", "can't", "won't", "not", "unable"]
-    if has_signal:
-        for neg in negations:
-            # Simple check: if a negation word is present, we are cautious.
-            # Exception: "Why not? Agreed." -> contains 'not' but is an agreement.
-            # This is a heuristic; the AI extraction is the primary source of truth, 
-            # but this signal check prevents false positives on simple chatter.
-            if neg in content and ("confirmed" not in content and "agreed" not in content):
-                has_signal = False
+    # Simple check: if a negation word is present, we are cautious.
+    # Exception: "Why not? Agreed." -> contains 'not' but is an agreement.
+    # This is a heuristic; the AI extraction is the primary source of truth, 
+    # but this signal check prevents false positives on simple chatter.
+    if has_signal and _NEG_RE.search(content) and "confirmed" not in content and "agreed" not in content:
+        has_signal = False
+
+    # No agreement signal (ordinary haggling) -> nothing else to check
+    if not has_signal:
+        return False, None
     
     # 2. Consolidate Terms
     # We combine the terms found in the LATEST message (by Haiku) 
@@ -94,32 +134,33 @@ def detect_deal_readiness(history, current_extracted_terms=None):
     # 3. Backfill missing terms from history (Context Window)
     # If the user says "Deal", they are implicitly accepting the AI's last offer.
     # We need to find what the AI last proposed to fill in the blanks.
-    if has_signal:
-        for msg in reversed(history):
-            # If we are still missing terms, check the AI's previous messages
-            if msg['role'] == 'assistant':
-                txt = msg['content']
-                
-                # FALLBACK REGEX (Only for AI text, which is predictable)
-                # We search AI text to see what offer is currently on the table
-                if final_terms['price'] is None: 
-                    m = re.search(r'\$\s*([0-9][0-9,]*(?:\.\d+)?)', txt)
-                    if m: final_terms['price'] = float(m.group(1).replace(',', ''))
-                
-                if final_terms['delivery'] is None:
-                    m = re.search(r'(\d+)\s*days?', txt.lower())
-                    if m: final_terms['delivery'] = int(m.group(1))
-                    
-                # If we have both now, stop searching back
-                if final_terms['price'] and final_terms['delivery']:
-                    break
+    for msg in reversed(history[-BACKFILL_LOOKBACK:]):
+        # Stop searching back as soon as both terms are on the table
+        # (including when the current turn already supplied them)
+        if final_terms['price'] is not None and final_terms['delivery'] is not None:
+            break
+
+        # If we are still missing terms, check the AI's previous messages
+        if msg['role'] == 'assistant':
+            txt = msg['content']
+            
+            # FALLBACK REGEX (Only for AI text, which is predictable)
+            # We search AI text to see what offer is currently on the table
+            # One pass per message; the FIRST price/delivery in it wins
+            for m in _TERMS_RE.finditer(txt):
+                kind = m.lastgroup
+                if final_terms[kind] is not None: continue
+                value = m.group(kind)
+                if kind == 'price': final_terms['price'] = float(value.replace(',', ''))
+                else: final_terms['delivery'] = int(value)
+                if final_terms['price'] is not None and final_terms['delivery'] is not None: break
     
     # 4. Final Verification
     has_price = final_terms["price"] is not None
     has_delivery = final_terms["delivery"] is not None
     
     # Only return True if we have the Signal AND both critical terms
-    if has_signal and has_price and has_delivery:
+    if has_price and has_delivery:
         return True, final_terms
         
     return False, None
@@ -1,18 +1,23 @@
 import boto3
-import json
+from botocore.exceptions import ClientError
 from decimal import Decimal
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, List
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from mangum import Mangum
 
 # IMPORT YOUR MODULES
 # Ensure these files (ai_service.py, logic.py) are in the same folder
-from ai_service import get_bedrock_response, create_negotiation_prompt, get_evaluation
-from logic import generate_deal_parameters, format_deal_parameters, detect_deal_readiness
+from ai_service import get_bedrock_response, create_negotiation_prompt, get_evaluation, stream_evaluation, extract_terms_locally, extract_terms_with_haiku
+from logic import generate_deal_parameters, format_session_texts, detect_deal_readiness
 
 app = FastAPI(title="AI Negotiator", version="1.0.0")
 
@@ -26,14 +31,18 @@ app.add_middleware(
 )
 
 # --- DATA MODELS ---
+# Request bodies are parsed once and discarded; unknown fields are dropped, not stored
 class NewSessionRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
     student_id: Optional[str] = None
 
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
     session_id: str
     user_input: str
 
 class EvaluateRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
     session_id: str
     final_terms: Dict  # Expects data like: {price: 50, delivery: 30, volume: 10000}
 
@@ -41,12 +50,100 @@ class EvaluateRequest(BaseModel):
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('NegotiationSessions')
 
+# Background worker for Bedrock calls we can overlap with DynamoDB I/O
+executor = ThreadPoolExecutor(max_workers=2)
+
+# NOTE: endpoints are plain `def` on purpose. FastAPI runs sync endpoints in its threadpool,
+# so blocking boto3 calls don't stall the event loop, and Lambda only sends one request
+# per container at a time. Overlap inside a request goes through `executor` instead.
+
+# Process-local LRU in front of DynamoDB so hot sessions skip the get_item on warm containers.
+# Another container may have served the session's last turn, so writes are conditional on
+# the conversation length we saw (see append_to_session); the TTL just bounds memory use.
+SESSION_CACHE_SIZE = 1024
+SESSION_CACHE_TTL = 60  # seconds
+session_cache = OrderedDict()  # session_id -> (expires_at, session)
+# append_to_session runs on `executor` threads, so every cache touch goes through this lock
+session_cache_lock = threading.Lock()
+
+def cache_session(session):
+    with session_cache_lock:
+        session_cache[session['session_id']] = (time.monotonic() + SESSION_CACHE_TTL, session)
+        session_cache.move_to_end(session['session_id'])
+        if len(session_cache) > SESSION_CACHE_SIZE:
+            session_cache.popitem(last=False)
+
+def uncache_session(session_id):
+    with session_cache_lock:
+        session_cache.pop(session_id, None)
+
+def cached_entry(session_id):
+    """Returns (expires_at, session) from the cache, or None. Does not refresh LRU order."""
+    with session_cache_lock:
+        return session_cache.get(session_id)
+
+class StaleSessionError(Exception):
+    """Our copy of the conversation is behind DynamoDB (another container appended first)."""
+
+def load_session(session_id, fresh=False):
+    """Returns the session (cache first unless `fresh`, then DynamoDB) or raises a 404."""
+    session = None
+    if not fresh:
+        with session_cache_lock:
+            entry = session_cache.get(session_id)
+            if entry and entry[0] > time.monotonic():
+                session_cache.move_to_end(session_id)
+                session = entry[1]
+    if session is None:
+        response = table.get_item(Key={'session_id': session_id})
+        if 'Item' not in response:
+            uncache_session(session_id)
+            raise HTTPException(status_code=404, detail="Session not found")
+        session = response['Item']
+        cache_session(session)
+    # Callers append to the conversation; don't let that leak into the cache before it's saved
+    return {**session, 'conversation': list(session['conversation'])}
+
+def save_session(session):
+    table.put_item(Item=session)
+    cache_session(session)
+
+def append_to_session(session, new_messages):
+    """
+    Writes only the new messages (list_append) instead of rewriting the whole conversation.
+    Raises StaleSessionError if DynamoDB holds more messages than the copy we built on.
+    """
+    try:
+        table.update_item(
+            Key={'session_id': session['session_id']},
+            UpdateExpression='SET conversation = list_append(conversation, :m)',
+            ConditionExpression='size(conversation) = :n',
+            ExpressionAttributeValues={
+                ':m': new_messages,
+                ':n': len(session['conversation']) - len(new_messages)
+            }
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        uncache_session(session['session_id'])
+        raise StaleSessionError(session['session_id'])
+    cache_session(session)
+
 # Helper function to handle decimal type (for JSON serialization)
 def decimal_default(obj):
     if isinstance(obj, Decimal):
         return float(obj)
     raise TypeError
 
+# DynamoDB rejects floats; convert a (nested dict) deal_params without a JSON round-trip
+def to_decimal(obj):
+    if isinstance(obj, dict):
+        return {k: to_decimal(v) for k, v in obj.items()}
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    return obj
+
 @app.post("/api/sessions/new")
 def create_session(request: NewSessionRequest):
     session_id = str(uuid.uuid4())
@@ -54,28 +151,19 @@ def create_session(request: NewSessionRequest):
     # 1. Generate Smart Parameters
     deal_params = generate_deal_parameters(request.student_id)
     
-    # 2. Format them for the AI 
-    deal_params_str = format_deal_parameters(deal_params)
-    
-    # 3. Create Greeting
-    greeting = (
-        f"Hello! I'm Alex from ChipSource Inc. We are looking to sell our CS-1000 chips. "
-        f"Our standard opening is ${deal_params['price']['opening']} per unit "
-        f"with {deal_params['delivery']['opening']}-day delivery. What works for you?"
-    )
+    # 2-3. Format them for the AI and create the greeting (one pass over deal_params)
+    deal_params_str, greeting = format_session_texts(deal_params)
 
-    # 4. Save to DynamoDB
-    # We use json.loads(json.dumps(...)) to convert floats to Decimals if needed, 
-    # or ensure your generate_deal_parameters returns Decimals compatible with DynamoDB.
+    # 4. Save to DynamoDB (floats -> Decimals, which DynamoDB requires)
     item = {
         'session_id': session_id,
-        'deal_params': json.loads(json.dumps(deal_params, default=decimal_default), parse_float=Decimal),
+        'deal_params': to_decimal(deal_params),
         'deal_params_str': deal_params_str,
         'conversation': [{"role": "assistant", "content": greeting}],
         'created_at': datetime.utcnow().isoformat()
     }
     
-    table.put_item(Item=item)
+    save_session(item)
 
     return {
         "session_id": session_id,
@@ -85,31 +173,48 @@ def create_session(request: NewSessionRequest):
 
 @app.post("/api/chat")
 def chat(request: ChatRequest):
-    # 1. Fetch from DynamoDB
-    response = table.get_item(Key={'session_id': request.session_id})
-    if 'Item' not in response:
-        raise HTTPException(status_code=404, detail="Session not found")
+    # 0. Most messages are parsed locally. When Haiku is needed, it only overlaps the session
+    # read for a session this container knows whose cached copy has expired (so a get_item is
+    # coming anyway); unknown ids are looked up first so a bogus session_id can't cost a call.
+    extracted = extract_terms_locally(request.user_input)
+    haiku = None
+    entry = cached_entry(request.session_id)
+    if extracted is None and entry and entry[0] <= time.monotonic():
+        haiku = executor.submit(extract_terms_with_haiku, request.user_input)
 
-    session = response['Item']
+    for attempt in range(2):
+        # 1. Fetch session (cache, then DynamoDB; straight from DynamoDB on a retry)
+        session = load_session(request.session_id, fresh=attempt > 0)
+        if extracted is None:
+            extracted = haiku.result() if haiku else extract_terms_with_haiku(request.user_input)
 
-    # 2. Add User Input
-    session["conversation"].append({"role": "user", "content": request.user_input})
-    
-    # 3. Get AI Response
-    prompt = create_negotiation_prompt(
-        request.user_input,
-        session.get("deal_params_str", ""), # Use .get() for safety
-        session["conversation"]
-    )
-    
-    ai_response = get_bedrock_response(prompt)
-    session["conversation"].append({"role": "assistant", "content": ai_response})
-    
-    # 4. Save Update to DynamoDB (CRITICAL: Must happen BEFORE return)
-    table.put_item(Item=session)
+        # 2. Add User Input
+        session["conversation"].append({"role": "user", "content": request.user_input})
+        
+        # 3. Get AI Response
+        prompt = create_negotiation_prompt(
+            request.user_input,
+            session.get("deal_params_str", ""), # Use .get() for safety
+            session["conversation"],
+            extracted=extracted
+        )
+        
+        ai_response = get_bedrock_response(prompt)
+        session["conversation"].append({"role": "assistant", "content": ai_response})
+        
+        # 4. Save Update to DynamoDB (CRITICAL: Must happen BEFORE return)
+        # The write runs in the background while we check for a deal; we wait on it below.
+        saved = executor.submit(append_to_session, session, session["conversation"][-2:])
 
-    # 5. CHECK FOR DEAL
-    is_deal_ready, proposed_terms = detect_deal_readiness(session["conversation"])
+        # 5. CHECK FOR DEAL
+        is_deal_ready, proposed_terms = detect_deal_readiness(session["conversation"])
+        try:
+            saved.result()
+            break
+        except StaleSessionError:
+            # We built this turn on a stale conversation; redo it once on fresh history
+            if attempt:
+                raise HTTPException(status_code=409, detail="Session was updated concurrently, please retry")
     
     return {
         "ai_response": ai_response,
@@ -120,12 +225,8 @@ def chat(request: ChatRequest):
 
 @app.post("/api/evaluate")
 def evaluate_session(request: EvaluateRequest):
-    # 1. Fetch from DynamoDB
-    response = table.get_item(Key={'session_id': request.session_id})
-    if 'Item' not in response:
-        raise HTTPException(status_code=404, detail="Session not found")
-        
-    session = response['Item']
+    # 1. Fetch session straight from DynamoDB: another container may have served the last turns
+    session = load_session(request.session_id, fresh=True)
     
     # 2. Generate Report Card
     # Ensure deal_params is converted back from Decimal if your logic.py expects floats
@@ -141,4 +242,16 @@ def evaluate_session(request: EvaluateRequest):
         "status": "completed"
     }
 
+@app.post("/api/evaluate/stream")
+def evaluate_session_stream(request: EvaluateRequest):
+    # Same report as /api/evaluate, streamed as plain text so clients can render it progressively.
+    # Behind API Gateway + Mangum the body is still buffered; use a uvicorn host or a
+    # RESPONSE_STREAM Function URL to get the first bytes early.
+    session = load_session(request.session_id, fresh=True)
+
+    return StreamingResponse(
+        stream_evaluation(session["conversation"], session["deal_params"], request.final_terms),
+        media_type="text/plain"
+    )
+
 handler = Mangum(app)
@@ -26,3 +26,81 @@ USER INPUT: "{user_input}"
 ### RESPONSE ###
 [Write your response as Alex here]
 """
+
+EVAL_PROMPT_TEMPLATE = """
+You are an expert negotiation coach and evaluator. Analyze the following B2B negotiation and provide a comprehensive evaluation.
+
+--- SELLER'S (AI's) SECRET PARAMETERS ---
+(The AI uses 0-5% reductions between price/delivery levels to enable dynamic negotiation with meaningful concessions)
+Price Opening: ${price_opening}
+Price Target (AI's Ideal): ${price_target}
+Price Reservation (AI's Walk-away): ${price_reservation}
+
+Delivery Opening: {delivery_opening} days
+Delivery Target (AI's Ideal): {delivery_target} days
+Delivery Reservation (AI's Fastest): {delivery_reservation} days
+
+--- NEGOTIATION CONVERSATION ---
+{conversation_log}
+
+--- ACADEMIC EVALUATION RUBRIC (Evaluate the USER) ---
+Please evaluate the USER'S performance on the following criteria. Note that the AI was instructed to use strict 0-5% reductions.
+
+1. Deal Quality & Outcome (Weight: 33%)
+Excellent (A: 90-100): Achieved a deal at or very close to the AI's reservation points for both price and delivery.
+Proficient (B: 80-89): Achieved a strong deal, significantly better than the AI's opening offers but not quite at reservation limits.
+Developing (C: 70-79): Reached an agreement, but the deal is only slightly better than the AI's opening offers.
+Needs Improvement (D/F: 0-69): Failed to reach an agreement, or accepted a deal at or worse than the AI's opening offers.
+
+2. Trade-off Strategy & Analytical Reasoning (Weight: 28%)
+Excellent (A: 90-100): User demonstrates strong analytical reasoning and actively proposes logical, win-win trade-offs.
+Proficient (B: 80-89): User identifies at least one meaningful trade-off with sound reasoning.
+Developing (C: 70-79): User shows limited recognition of trade-offs; tends to focus on single variables.
+Needs Improvement (D/F: 0-69): User made no attempt to use trade-offs; offers were inconsistent or illogical.
+
+3. Professionalism & Communication (Weight: 17%)
+Excellent (A: 90-100): User maintains professional tone, justifies positions with business logic, shows strong persuasion skills.
+Proficient (B: 80-89): User is mostly professional and clear with minor lapses.
+Developing (C: 70-79): User has some professional tone but lacks clarity in justifications.
+Needs Improvement (D/F: 0-69): User used unprofessional, argumentative, or overly casual tone.
+
+4. Negotiation Process Management (Weight: 11%)
+Excellent (A: 90-100): User efficiently manages negotiation flow, summarizes progress, confirms offers clearly.
+Proficient (B: 80-89): User is mostly structured with minor flow issues.
+Developing (C: 70-79): User's conversation flow is disorganized or purely reactive.
+Needs Improvement (D/F: 0-69): User's process is chaotic or incomplete.
+
+5. Creativity & Adaptability (Weight: 11%)
+Excellent (A: 90-100): User employs innovative solutions and adapts effectively to counteroffers.
+Proficient (B: 80-89): User shows some creativity or adaptation.
+Developing (C: 70-79): User shows limited adaptation, mostly repeats offers.
+Needs Improvement (D/F: 0-69): User made no attempt to adjust strategy or be creative.
+
+--- OUTPUT FORMAT ---
+FINAL EVALUATION REPORT
+
+Final Deal Achieved:
+Price: ${final_price}
+Delivery: {final_delivery} days
+Volume: {final_volume} units
+
+Metrics Scores:
+Deal Quality: [score]/100 (Weight: 33%)
+Trade-off Strategy: [score]/100 (Weight: 28%)
+Professionalism: [score]/100 (Weight: 17%)
+Process Management: [score]/100 (Weight: 11%)
+Creativity & Adaptability: [score]/100 (Weight: 11%)
+
+Overall Weighted Score: [calculated_score]/100
+
+Key Strengths:
+[Specific strength based on high-scoring categories]
+[Additional strength]
+
+Areas for Improvement:
+[Specific area based on low-scoring categories]
+[Additional area]
+
+Feedback & Recommendations:
+[2-3 paragraphs of constructive, specific feedback about how the user engaged with the AI's dynamic concession patterns and negotiation flexibility.]
+"""
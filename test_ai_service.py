@@ -0,0 +1,73 @@
+import io
+import json
+
+import pytest
+
+import ai_service
+
+# Rejections that name a price must never come back as the user's offer
+REJECTIONS = [
+    "$50 is too high",
+    "I do not accept $50",
+    "Unable to accept $50",
+    "I'd rather not pay $50",
+    "$50? No.",
+    "I can’t do $50.",
+    "I can't do $50",
+    "No way I'm paying $50",
+    "That's too much, $50 won't work",
+]
+
+@pytest.mark.parametrize("text", REJECTIONS)
+def test_rejections_skip_local_path(text):
+    assert ai_service.extract_terms_locally(text) is None
+
+@pytest.mark.parametrize("text, expected", [
+    ("I can do $45", {"price": 45.0, "delivery": None, "volume": None}),
+    ("$42.50 with 20 days delivery", {"price": 42.5, "delivery": 20, "volume": None}),
+    ("How about $40 for 5k units?", {"price": 40.0, "delivery": None, "volume": 5000}),
+])
+def test_plain_offers_stay_local(text, expected):
+    assert ai_service.extract_terms_locally(text) == expected
+
+@pytest.mark.parametrize("text, price", [
+    ("I can't do $50, how about $45?", 45.0),
+    ("I can’t do $50, how about $45?", 45.0),
+    ("Unable to accept $50, what if $44?", 44.0),
+    ("I do not accept $50. I propose $46", 46.0),
+])
+def test_rejection_with_counteroffer_stays_local(text, price):
+    assert ai_service.extract_terms_locally(text)["price"] == price
+
+@pytest.mark.parametrize("text", [
+    "I can't do $50. $45 works?",
+    "I won't pay more than $40",
+    "$50 is too high, how about $45?",
+])
+def test_rejection_without_clear_counter_skips_local_path(text):
+    assert ai_service.extract_terms_locally(text) is None
+
+class _FakeHaiku:
+    """Stands in for the Bedrock client; answers every extraction with a null price."""
+    def invoke_model(self, **kwargs):
+        body = io.BytesIO(json.dumps({"content": [{"text": '{"price": null, "delivery": null, "volume": null}'}]}).encode())
+        return {"body": body}
+
+def test_rejection_holds_price(monkeypatch):
+    monkeypatch.setattr(ai_service, "_BEDROCK", _FakeHaiku())
+    history = [
+        {"role": "assistant", "content": "Our price is $50 per unit."},
+        {"role": "user", "content": "$50 is too high"},
+    ]
+    guidance = ai_service.generate_turn_guidance("$50 is too high", history, "")
+    assert guidance.startswith("Hold at $50")
+
+def test_ok_before_an_offer_is_still_haggling():
+    # "ok" is filler here, not agreement: the offer must still reach Rule E
+    history = [
+        {"role": "assistant", "content": "Our price is $400 per unit."},
+        {"role": "user", "content": "Ok, I can do $300"},
+    ]
+    extracted = {"price": 300.0, "delivery": None, "volume": None}
+    guidance = ai_service.generate_turn_guidance("Ok, I can do $300", history, "", extracted=extracted)
+    assert guidance.startswith("User is lowballing ($300.0). You MUST offer exactly $398.0.")
@@ -0,0 +1,60 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import lambda_fucintion
+import main
+
+ORIGIN = "https://app.example.com"
+CORS_HEADERS = ("access-control-allow-origin", "access-control-allow-credentials", "vary")
+
+def _reset(table, bedrock):
+    # Both paths must see the same starting session and the same "AI turn 1"
+    table.items.clear()
+    main.session_cache.clear()
+    bedrock.clear()
+    main.save_session({
+        'session_id': "s1",
+        'deal_params_str': "1. Opening Price: $400",
+        'conversation': [{"role": "assistant", "content": "Hello! Our opening is $400 per unit."}],
+    })
+
+def _via_fastapi(body):
+    client = TestClient(main.app)
+    response = client.post("/api/chat", content=body,
+                           headers={"content-type": "application/json", "origin": ORIGIN})
+    headers = {k: response.headers.get(k) for k in CORS_HEADERS}
+    return response.status_code, response.json(), headers
+
+def _via_lambda(body, base64_body=False):
+    if base64_body and body is not None:
+        body = base64.b64encode(body.encode()).decode()
+    event = {
+        "version": "2.0",
+        "rawPath": "/api/chat",
+        "rawQueryString": "",
+        "headers": {"content-type": "application/json", "Origin": ORIGIN},
+        "requestContext": {"http": {"method": "POST", "path": "/api/chat"}},
+        "body": body,
+        "isBase64Encoded": base64_body,
+    }
+    response = lambda_fucintion.lambda_handler(event, None)
+    headers = {k.lower(): v for k, v in response["headers"].items()}
+    return response["statusCode"], json.loads(response["body"]), {k: headers.get(k) for k in CORS_HEADERS}
+
+@pytest.mark.parametrize("body", [
+    None,                                               # missing body
+    "{bad",                                             # invalid JSON
+    "[]",                                               # JSON that isn't an object
+    '{"session_id": 1, "user_input": "I can do $380"}',  # wrong field type
+    '{"session_id": "nope", "user_input": "I can do $380"}',  # unknown session (404)
+    '{"session_id": "s1", "user_input": "I can do $380"}',    # valid request
+])
+@pytest.mark.parametrize("base64_body", [False, True])
+def test_fast_route_matches_fastapi(table, bedrock, body, base64_body):
+    _reset(table, bedrock)
+    expected = _via_fastapi(body)
+    _reset(table, bedrock)
+    assert _via_lambda(body, base64_body) == expected
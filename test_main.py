@@ -0,0 +1,61 @@
+import pytest
+from fastapi import HTTPException
+
+import main
+
+GREETING = {"role": "assistant", "content": "Hello! Our opening is $400 per unit."}
+OTHER_TURN = [
+    {"role": "user", "content": "What about 30 days delivery?"},
+    {"role": "assistant", "content": "30 days works at $400."},
+]
+
+def _new_session(table, session_id="s1"):
+    main.save_session({
+        'session_id': session_id,
+        'deal_params_str': "1. Opening Price: $400",
+        'conversation': [dict(GREETING)],
+    })
+    return session_id
+
+def test_chat_appends_the_turn(table, bedrock):
+    sid = _new_session(table)
+    result = main.chat(main.ChatRequest(session_id=sid, user_input="I can do $380"))
+
+    assert result["ai_response"] == "AI turn 1"
+    assert table.items[sid]['conversation'] == [
+        GREETING,
+        {"role": "user", "content": "I can do $380"},
+        {"role": "assistant", "content": "AI turn 1"},
+    ]
+    assert len(bedrock) == 1
+
+def test_chat_redoes_a_stale_turn_once_on_fresh_history(table, bedrock):
+    sid = _new_session(table)
+    # Another container serves a turn; our cached copy still ends at the greeting
+    table.interlopers.append(OTHER_TURN)
+
+    result = main.chat(main.ChatRequest(session_id=sid, user_input="I can do $380"))
+
+    assert result["ai_response"] == "AI turn 2"
+    assert table.items[sid]['conversation'] == [
+        GREETING,
+        *OTHER_TURN,
+        {"role": "user", "content": "I can do $380"},
+        {"role": "assistant", "content": "AI turn 2"},
+    ]
+    # The redo was prompted with the other container's turn
+    assert len(bedrock) == 2
+    assert "30 days works at $400." in bedrock[1]
+    assert "30 days works at $400." not in bedrock[0]
+
+def test_chat_gives_up_with_409_on_a_second_conflict(table, bedrock):
+    sid = _new_session(table)
+    table.interlopers.extend([OTHER_TURN, OTHER_TURN])
+
+    with pytest.raises(HTTPException) as exc:
+        main.chat(main.ChatRequest(session_id=sid, user_input="I can do $380"))
+
+    assert exc.value.status_code == 409
+    # Only the other container's turns were written; ours never landed
+    assert table.items[sid]['conversation'] == [GREETING, *OTHER_TURN, *OTHER_TURN]
+    assert sid not in main.session_cache